@@ -19,14 +19,15 @@ async function runLighthouse(url) {
 
 // API endpoint
 app.post("/audit", async (req, res) => {
-    const { url } = req.body;
+    const { url, lighthouse } = req.body;
     try {
-        const auditResults = await runLighthouse(url);
+        // Lighthouse launches a full headless Chrome per audit; only run it on request
+        const auditResults = lighthouse ? await runLighthouse(url) : null;
         const sslResults = await sslChecker(url.replace("https://","").replace("http://",""));
 
         res.json({
-            performance: auditResults.performance.score * 100,
-            seo: auditResults.seo.score * 100,
+            performance: auditResults ? auditResults.performance.score * 100 : null,
+            seo: auditResults ? auditResults.seo.score * 100 : null,
             ssl: sslResults,
         });
     } catch (error) {
@@ -2,7 +2,11 @@ import subprocess
 import json
 import os
 
-def analyze_performance(url):
+def analyze_performance(url, run_lighthouse=False):
+    # Lighthouse launches a full headless Chrome per audit; only run it on request
+    if not run_lighthouse:
+        return {"lighthouse_skipped": "Pass run_lighthouse=True to run a full Lighthouse audit."}
+
     report_path = "./reports/lighthouse_report.json"
 
     try:
@@ -13,7 +17,7 @@ def analyze_performance(url):
             "--output=json",
             f"--output-path={report_path}"
         ]
-        subprocess.run(" ".join(command), shell=True, check=True)
+        subprocess.run(command, check=True)
 
         with open(report_path, "r") as f:
             report = json.load(f)
@@ -1,11 +1,17 @@
-from flask import Flask, request, jsonify
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify, stream_with_context
 from urllib.parse import urljoin
 import requests
 import tldextract
 
 from audit.utils import normalize_url
-from audit.security import analyze_security
-from audit.performance import analyze_performance
+from audit.hosthealth import registry, guarded_request, host_of
+from audit.headerpolicy import cache_stats
+from audit.security import analyze_security, check_headers, check_robots, check_tls, summarize
+from audit.performance import analyze_performance, lighthouse_metrics
+from audit.results import AuditResult
 from config import REQUEST_TIMEOUT, MAX_ASSET_CHECKS, USER_AGENT
 
 app = Flask(__name__)
@@ -14,57 +20,153 @@ app = Flask(__name__)
 def health():
     return {"ok": True}
 
-@app.route("/api/audit", methods=["POST"])
-def audit():
-    data = request.get_json(silent=True) or {}
-    raw_url = data.get("url", "")
-    if not raw_url:
-        return jsonify({"error": "url is required"}), 400
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    return jsonify({"hosts": registry.snapshot(), "policy_cache": cache_stats()})
 
-    url = normalize_url(raw_url)
-    headers = {"User-Agent": USER_AGENT}
-    try:
-        resp = requests.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True, headers=headers)
-    except requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Failed to fetch {url}: {str(e)}"}), 502
 
-    # robots.txt
+def fetch_robots(resp, headers):
     robots_url = urljoin(resp.url, "/robots.txt")
-    robots_text = None
     try:
-        r = requests.get(robots_url, timeout=REQUEST_TIMEOUT, headers=headers)
+        r = guarded_request("GET", robots_url, timeout=REQUEST_TIMEOUT, retries=0, headers=headers)
         if r.status_code == 200 and len(r.text) < 200_000:
-            robots_text = r.text
+            return r.text
     except Exception:
         pass
+    return None
 
-    security = analyze_security(resp, resp.url, robots_text)
+
+def run_performance(resp, headers, lighthouse=False, cancel=None):
     performance = analyze_performance(
         resp,
         resp.url,
         max_checks=MAX_ASSET_CHECKS,
         timeout=REQUEST_TIMEOUT,
-        headers=headers
+        headers=headers,
+        cancel=cancel
+    )
+    # Lighthouse is slow and heavy; only run it when the client asks for it
+    if lighthouse and not (cancel is not None and cancel.is_set()):
+        lh = lighthouse_metrics(resp.url, cancel=cancel)
+        if "lighthouse_error" not in lh:
+            # simulated minus measured, for calibrating the network model
+            lh["fcp_delta_ms"] = performance.extra["simulated"]["fcp_ms"] - lh["fcp_ms"]
+            lh["lcp_delta_ms"] = performance.extra["simulated"]["lcp_ms"] - lh["lcp_ms"]
+        performance.extra["lighthouse"] = lh
+    return performance
+
+
+def overall_score(security, performance):
+    overall = int(round((security.score * 0.55) + (performance.score * 0.45)))
+    return {
+        "score": overall,
+        "grade": "A+" if overall >= 95 else
+                 "A"  if overall >= 85 else
+                 "B"  if overall >= 75 else
+                 "C"  if overall >= 65 else
+                 "D"  if overall >= 55 else "F"
+    }
+
+
+def audit_hosts(url, resp):
+    return registry.snapshot({host_of(url), host_of(resp.url), f"{host_of(resp.url)}:443"})
+
+
+def start_audit():
+    """Validate the request body and fetch the page. Returns ((data, url, headers, resp), error)."""
+    data = request.get_json(silent=True) or {}
+    raw_url = data.get("url", "")
+    if not raw_url:
+        return None, (jsonify({"error": "url is required"}), 400)
+
+    url = normalize_url(raw_url)
+    headers = {"User-Agent": USER_AGENT}
+    try:
+        resp = guarded_request("GET", url, timeout=REQUEST_TIMEOUT, allow_redirects=True, headers=headers)
+    except requests.exceptions.RequestException as e:
+        return None, (jsonify({"error": f"Failed to fetch {url}: {str(e)}"}), 502)
+    return (data, url, headers, resp), None
+
+
+@app.route("/api/audit", methods=["POST"])
+def audit():
+    started, error = start_audit()
+    if error:
+        return error
+    data, url, headers, resp = started
+
+    security = analyze_security(resp, resp.url, fetch_robots(resp, headers))
+    performance = run_performance(resp, headers, data.get("lighthouse"))
+
+    result = AuditResult(
+        input_url=data["url"],
+        final_url=resp.url,
+        status_code=resp.status_code,
+        overall=overall_score(security, performance),
+        security=security,
+        performance=performance,
+        hosts=audit_hosts(url, resp)
     )
+    # compact binary for clients that ask for it; findings stay as codes + params
+    if request.accept_mimetypes.best_match(["application/json", "application/msgpack"]) == "application/msgpack":
+        return Response(result.to_msgpack(), mimetype="application/msgpack")
+    return jsonify(result.to_dict())
+
+
+@app.route("/api/audit/stream", methods=["POST"])
+def audit_stream():
+    """Same audit as /api/audit, streamed as NDJSON: one line per section as it completes.
+
+    Sections arrive as page, headers, robots, tls, security (score and grade over the
+    three before it), performance, overall; a failure ends the stream with an "error"
+    section. robots.txt, TLS and asset probes start right away in the
+    background. If the client disconnects, queued asset probes are skipped and a running
+    Lighthouse process is killed; requests already on the wire finish on their own.
+    """
+    started, error = start_audit()
+    if error:
+        return error
+    data, url, headers, resp = started
+
+    def line(section, **payload):
+        return json.dumps({"section": section, **payload}) + "\n"
+
+    def generate():
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=3)
+        try:
+            tls = pool.submit(check_tls, resp.url)
+            robots = pool.submit(fetch_robots, resp, headers)
+            perf = pool.submit(run_performance, resp, headers, data.get("lighthouse"), cancel)
+            yield line("page", input_url=data["url"], final_url=resp.url, status_code=resp.status_code)
+
+            header_deduction, header_findings = check_headers(resp)
+            yield line("headers", findings=[f.to_dict() for f in header_findings])
+
+            robots_deduction, robots_findings = check_robots(robots.result())
+            yield line("robots", findings=[f.to_dict() for f in robots_findings])
+
+            tls_deduction, tls_findings = tls.result()
+            yield line("tls", findings=[f.to_dict() for f in tls_findings])
+
+            security = summarize(header_deduction + robots_deduction + tls_deduction,
+                                 header_findings + robots_findings + tls_findings)
+            yield line("security", security={"score": security.score, "grade": security.grade})
+
+            performance = perf.result()
+            yield line("performance", performance=performance.to_dict())
+
+            yield line("overall", overall=overall_score(security, performance), hosts=audit_hosts(url, resp))
+        except Exception as e:
+            app.logger.exception("streamed audit of %s failed", url)
+            yield line("error", error=f"Audit failed: {e}")
+        finally:
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-    # overall
-    overall = int(round((security["score"] * 0.55) + (performance["score"] * 0.45)))
-    return jsonify({
-        "input_url": raw_url,
-        "final_url": resp.url,
-        "status_code": resp.status_code,
-        "overall": {
-            "score": overall,
-            "grade": "A+" if overall >= 95 else
-                     "A"  if overall >= 85 else
-                     "B"  if overall >= 75 else
-                     "C"  if overall >= 65 else
-                     "D"  if overall >= 55 else "F"
-        },
-        "security": security,
-        "performance": performance
-    })
 
 if __name__ == "__main__":
     app.run(debug=True)
-
@@ -0,0 +1,191 @@
+# Canonical copy. site-audit/audit_modules/headerpolicy.py is vendored from this
+# file (the two apps are deployed separately): edit here, copy everything below
+# this header over, then run check_vendored.py from the repo root.
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Parsed and evaluated policies are cached by header value: sites behind the same
+# platform/CDN send byte-identical policies, so a batch mostly hits the cache.
+CACHE_SIZE = 4096
+
+HSTS_MIN_AGE = 15552000        # 180 days
+HSTS_PRELOAD_AGE = 31536000    # 1 year, required by the preload list
+WEAK_REFERRER = {"unsafe-url", "no-referrer-when-downgrade"}
+REFERRER_VALUES = WEAK_REFERRER | {
+    "no-referrer", "origin", "origin-when-cross-origin", "same-origin",
+    "strict-origin", "strict-origin-when-cross-origin",
+}
+SENSITIVE_FEATURES = {"camera", "microphone", "geolocation", "payment", "usb", "display-capture"}
+
+# code -> (type, message template); messages are only rendered for display
+POLICY_MESSAGES = {
+    "csp.no_default_src": ("warning", "CSP has no default-src; unlisted resource types are unrestricted."),
+    "csp.unsafe_inline": ("warning", "CSP allows 'unsafe-inline' scripts without a nonce or hash."),
+    "csp.unsafe_eval": ("warning", "CSP allows 'unsafe-eval'."),
+    "csp.wildcard": ("warning", "CSP script sources are overly broad: {sources}"),
+    "csp.strict": ("pass", "CSP uses nonces/hashes for scripts."),
+    "csp.no_object_src": ("info", "CSP does not set object-src 'none'."),
+    "csp.frame_ancestors": ("pass", "CSP restricts framing via frame-ancestors."),
+    "hsts.disabled": ("error", "HSTS max-age is missing or 0; the policy is disabled."),
+    "hsts.short": ("warning", "HSTS max-age is short ({days} days); use at least 180 days."),
+    "hsts.ok": ("pass", "HSTS max-age is {days} days."),
+    "hsts.preload_ineligible": ("warning", "HSTS preload requested but max-age < 1 year or includeSubDomains missing."),
+    "hsts.no_subdomains": ("info", "HSTS does not include subdomains."),
+    "referrer.unknown": ("warning", "Referrer-Policy value not recognised: {value}"),
+    "referrer.weak": ("warning", "Referrer-Policy '{policy}' leaks full URLs to other origins."),
+    "referrer.ok": ("pass", "Referrer-Policy is '{policy}'."),
+    "permissions.open": ("warning", "Permissions-Policy grants sensitive features to all origins: {features}"),
+    "permissions.ok": ("pass", "Permissions-Policy restricts {count} feature(s)."),
+    "cookie.samesite_insecure": ("error", "Cookie '{name}' is SameSite=None without Secure (rejected by browsers)."),
+    "cookie.missing_flags": ("warning", "Cookie '{name}' missing flags: {flags}"),
+}
+
+# (code, params, penalty)
+PolicyHit = Tuple[str, dict, int]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_csp(value: str) -> dict:
+    # shared between callers via the cache; treat the result as read-only
+    directives = {}
+    for part in value.split(";"):
+        tokens = part.split()
+        if tokens:
+            # first occurrence wins, later duplicates are ignored by browsers
+            directives.setdefault(tokens[0].lower(), tuple(tokens[1:]))
+    return directives
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evaluate_csp(value: str) -> Tuple[PolicyHit, ...]:
+    csp = parse_csp(value)
+    out = []
+    if "default-src" not in csp:
+        out.append(("csp.no_default_src", {}, 5))
+
+    script = csp.get("script-src", csp.get("default-src"))
+    if script is not None:
+        lowered = [s.lower() for s in script]
+        strict = any(s.startswith(("'nonce-", "'sha256-", "'sha384-", "'sha512-")) for s in lowered)
+        if "'unsafe-inline'" in lowered and not strict:
+            out.append(("csp.unsafe_inline", {}, 8))
+        if "'unsafe-eval'" in lowered:
+            out.append(("csp.unsafe_eval", {}, 4))
+        wild = [s for s in lowered if s in ("*", "http:", "https:", "data:") or s.endswith("://*")]
+        if wild:
+            out.append(("csp.wildcard", {"sources": ", ".join(wild)}, 6))
+        if strict:
+            out.append(("csp.strict", {}, 0))
+
+    if "object-src" not in csp and csp.get("default-src") != ("'none'",):
+        out.append(("csp.no_object_src", {}, 0))
+    if "frame-ancestors" in csp:
+        out.append(("csp.frame_ancestors", {}, 0))
+    return tuple(out)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evaluate_hsts(value: str) -> Tuple[PolicyHit, ...]:
+    m = re.search(r"max-age\s*=\s*\"?(\d+)", value, flags=re.I)
+    if not m or int(m.group(1)) == 0:
+        return (("hsts.disabled", {}, 10),)
+    age = int(m.group(1))
+    lowered = value.lower()
+    subdomains = "includesubdomains" in lowered
+    out = []
+    if age < HSTS_MIN_AGE:
+        out.append(("hsts.short", {"days": age // 86400}, 4))
+    else:
+        out.append(("hsts.ok", {"days": age // 86400}, 0))
+    if "preload" in lowered and (age < HSTS_PRELOAD_AGE or not subdomains):
+        out.append(("hsts.preload_ineligible", {}, 2))
+    elif not subdomains:
+        out.append(("hsts.no_subdomains", {}, 0))
+    return tuple(out)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evaluate_referrer_policy(value: str) -> Tuple[PolicyHit, ...]:
+    # comma-separated fallbacks; the last value the browser understands wins
+    known = [v for v in (t.strip().lower() for t in value.split(",")) if v in REFERRER_VALUES]
+    if not known:
+        return (("referrer.unknown", {"value": value}, 3),)
+    if known[-1] in WEAK_REFERRER:
+        return (("referrer.weak", {"policy": known[-1]}, 3),)
+    return (("referrer.ok", {"policy": known[-1]}, 0),)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evaluate_permissions_policy(value: str) -> Tuple[PolicyHit, ...]:
+    features = {}
+    for part in value.split(","):
+        name, _, allow = part.partition("=")
+        if name.strip():
+            features[name.strip().lower()] = allow.strip()
+    open_ = sorted(f for f, allow in features.items() if f in SENSITIVE_FEATURES and "*" in allow)
+    if open_:
+        return (("permissions.open", {"features": ", ".join(open_)}, 3),)
+    return (("permissions.ok", {"count": len(features)}, 0),)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def evaluate_cookie_attributes(attributes: str) -> Tuple[PolicyHit, ...]:
+    # Cached on the attribute part only: the name=value part carries per-session
+    # tokens, which would never hit and would keep audited sites' sessions in memory.
+    attrs = {}
+    for part in attributes.split(";"):
+        k, _, v = part.partition("=")
+        if k.strip():
+            attrs[k.strip().lower()] = v.strip().lower()
+    samesite = attrs.get("samesite")
+    if samesite == "none" and "secure" not in attrs:
+        return (("cookie.samesite_insecure", {}, 4),)
+    missing = [flag for flag, ok in (("Secure", "secure" in attrs), ("HttpOnly", "httponly" in attrs),
+                                     ("SameSite", samesite is not None)) if not ok]
+    if missing:
+        return (("cookie.missing_flags", {"flags": ", ".join(missing)}, 2),)
+    return ()
+
+
+def evaluate_cookie(value: str) -> Tuple[PolicyHit, ...]:
+    pair, _, attributes = value.partition(";")
+    name = pair.split("=", 1)[0].strip()
+    return tuple((code, {"name": name, **params}, cost)
+                 for code, params, cost in evaluate_cookie_attributes(attributes.strip()))
+
+
+EVALUATORS = {
+    "content-security-policy": evaluate_csp,
+    "strict-transport-security": evaluate_hsts,
+    "referrer-policy": evaluate_referrer_policy,
+    "permissions-policy": evaluate_permissions_policy,
+}
+
+
+def evaluate_policies(headers: dict, cookies: Iterable[str] = ()) -> Tuple[List[Tuple[str, dict]], int]:
+    """Evaluate security header values. ``headers`` must have lower-cased keys.
+
+    Returns ``(findings, penalty)`` where findings are ``(code, params)`` pairs;
+    ``POLICY_MESSAGES`` maps a code to its type and message template.
+    """
+    findings, penalty = [], 0
+    results = [fn(headers[h].strip()) for h, fn in EVALUATORS.items() if h in headers]
+    results += [evaluate_cookie(c) for c in cookies]
+    for result in results:
+        for code, params, cost in result:
+            findings.append((code, params))
+            penalty += cost
+    return findings, penalty
+
+
+def set_cookie_headers(resp) -> List[str]:
+    """Individual Set-Cookie values; ``resp.headers`` folds them into one string."""
+    raw = getattr(resp.raw, "headers", None)
+    if raw is not None and hasattr(raw, "getlist"):
+        return raw.getlist("Set-Cookie")
+    return []
+
+
+def cache_stats() -> dict:
+    return {fn.__name__: fn.cache_info()._asdict() for fn in (parse_csp, *EVALUATORS.values(), evaluate_cookie_attributes)}
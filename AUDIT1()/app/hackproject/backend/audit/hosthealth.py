@@ -0,0 +1,198 @@
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+import requests
+from typing import Optional
+
+MIN_TIMEOUT = 2.0              # seconds; floor for adaptive timeouts
+TIMEOUT_FACTOR = 4             # adaptive timeout = p95 latency * factor
+MIN_SAMPLES = 5                # latencies needed before adapting
+WINDOW = 50                    # latencies kept per host
+RETRIES = 2                    # extra attempts per call, if the budget allows
+RETRY_BUDGET = 10.0            # max retry tokens per host
+RETRY_REFILL = 0.1             # tokens earned per successful request
+BACKOFF_BASE = 0.25            # seconds
+BACKOFF_CAP = 2.0
+BREAKER_FAILURES = 5           # consecutive failures that open the breaker
+BREAKER_COOLDOWN = 60.0        # seconds before a half-open probe is allowed
+MAX_HOSTS = 1000               # hosts tracked at once
+HOST_IDLE_TTL = 600.0          # seconds a closed host is kept without traffic
+# Only these mean the host (or its gateway) is unhealthy. Other statuses, e.g. a
+# 405/501 answer to HEAD, are normal responses and must not trip the breaker.
+FAILURE_STATUS = {502, 503, 504}
+FAILURE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+# A read timeout means the host took the request and hung; asking again would hang
+# again, so only failures to connect (ConnectTimeout included) are retried.
+RETRY_ERRORS = (requests.exceptions.ConnectionError,)
+
+
+class HostUnavailable(requests.exceptions.ConnectionError):
+    """Raised instead of contacting a host whose circuit breaker is open."""
+
+
+class HostState:
+    def __init__(self):
+        self.latencies = deque(maxlen=WINDOW)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.retry_tokens = RETRY_BUDGET
+        self.opened_at = None
+        self.probing = False
+        self.last_used = time.monotonic()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class HostRegistry:
+    """Latency, retry budget and circuit-breaker state, keyed by host (netloc)."""
+
+    def __init__(self):
+        self._hosts = OrderedDict()     # least recently used first
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> HostState:
+        now = time.monotonic()
+        st = self._hosts.get(host)
+        if st is None:
+            self._evict(now, room=1)
+            st = self._hosts[host] = HostState()
+        else:
+            self._hosts.move_to_end(host)
+        st.last_used = now
+        return st
+
+    def _evict(self, now: float, room: int = 0):
+        # Drop idle hosts, and the least recently used ones beyond MAX_HOSTS. Open or
+        # half-open breakers are kept so a dead host stays short-circuited.
+        for host, st in list(self._hosts.items()):
+            if len(self._hosts) + room <= MAX_HOSTS and now - st.last_used < HOST_IDLE_TTL:
+                break
+            if st.opened_at is None and not st.probing:
+                del self._hosts[host]
+
+    def admit(self, host: str) -> Optional[str]:
+        """Return "closed" or "probe" if the call may go ahead, None if the breaker is open.
+
+        A caller admitted as "probe" must call ``end_probe`` when done (use try/finally).
+        """
+        with self._lock:
+            st = self._state(host)
+            if st.opened_at is None:
+                return "closed"
+            # half-open: let one probe through once the cooldown has passed
+            if not st.probing and time.monotonic() - st.opened_at >= BREAKER_COOLDOWN:
+                st.probing = True
+                return "probe"
+            st.short_circuited += 1
+            return None
+
+    def end_probe(self, host: str):
+        with self._lock:
+            self._state(host).probing = False
+
+    def timeout_for(self, host: str, default: float) -> float:
+        with self._lock:
+            st = self._state(host)
+            if len(st.latencies) < MIN_SAMPLES:
+                return default
+            return max(MIN_TIMEOUT, min(default, st.percentile(95) * TIMEOUT_FACTOR / 1000))
+
+    def take_retry(self, host: str) -> bool:
+        with self._lock:
+            st = self._state(host)
+            if st.retry_tokens < 1:
+                return False
+            st.retry_tokens -= 1
+            st.retries += 1
+            return True
+
+    def record(self, host: str, latency_ms: Optional[float] = None, ok: bool = True):
+        with self._lock:
+            st = self._state(host)
+            st.requests += 1
+            if ok:
+                st.latencies.append(latency_ms)
+                st.consecutive_failures = 0
+                st.opened_at = None
+                st.retry_tokens = min(RETRY_BUDGET, st.retry_tokens + RETRY_REFILL)
+            else:
+                st.failures += 1
+                st.consecutive_failures += 1
+                if st.consecutive_failures >= BREAKER_FAILURES:
+                    st.opened_at = time.monotonic()
+
+    def snapshot(self, hosts=None) -> dict:
+        with self._lock:
+            self._evict(time.monotonic())
+            out = {}
+            for host, st in self._hosts.items():
+                if hosts is not None and host not in hosts:
+                    continue
+                p50, p95 = st.percentile(50), st.percentile(95)
+                out[host] = {
+                    "state": "closed" if st.opened_at is None else "half-open" if st.probing else "open",
+                    "p50_ms": int(p50) if p50 is not None else None,
+                    "p95_ms": int(p95) if p95 is not None else None,
+                    "requests": st.requests,
+                    "failures": st.failures,
+                    "retries": st.retries,
+                    "short_circuited": st.short_circuited,
+                }
+            return out
+
+
+registry = HostRegistry()
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc
+
+
+def guarded_request(method: str, url: str, *, timeout: float = 10, retries: int = RETRIES, **kwargs):
+    """requests.request() with adaptive timeout, budgeted jittered retries and a circuit breaker.
+
+    ``timeout`` is shared by all attempts: a retry only starts if at least
+    MIN_TIMEOUT of it is left after the backoff.
+    """
+    host = host_of(url)
+    if not host:
+        # nothing to track (e.g. a data: URI); requests rejects it on its own
+        return requests.request(method, url, timeout=timeout, **kwargs)
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        admission = registry.admit(host)
+        if admission is None:
+            raise HostUnavailable(f"{host} is failing repeatedly; skipped for up to {int(BREAKER_COOLDOWN)}s")
+        backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        start = time.perf_counter()
+        try:
+            attempt_timeout = min(registry.timeout_for(host, timeout), deadline - time.monotonic())
+            resp = requests.request(method, url, timeout=attempt_timeout, **kwargs)
+        except FAILURE_ERRORS as e:
+            registry.record(host, ok=False)
+            if not isinstance(e, RETRY_ERRORS) or not _may_retry(host, attempt, retries, deadline - backoff):
+                raise
+        else:
+            ok = resp.status_code not in FAILURE_STATUS
+            registry.record(host, (time.perf_counter() - start) * 1000, ok=ok)
+            if ok or not _may_retry(host, attempt, retries, deadline - backoff):
+                return resp
+        finally:
+            if admission == "probe":
+                registry.end_probe(host)
+        time.sleep(backoff)
+        attempt += 1
+
+
+def _may_retry(host: str, attempt: int, retries: int, deadline: float) -> bool:
+    return attempt < retries and deadline - time.monotonic() >= MIN_TIMEOUT and registry.take_retry(host)
@@ -1,73 +1,134 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils import parse_assets, head_size, has_mixed_content, grade
+from .pageload import build_graph, simulate
+from .hosthealth import registry, host_of
+from .results import Section, finding
 from urllib.parse import urlparse
 
-def analyze_performance(resp, base_url: str, max_checks=40, timeout=10, headers=None):
+def analyze_performance(resp, base_url: str, max_checks=40, timeout=10, headers=None, cancel=None):
     score = 100
     findings = []
 
     # TTFB & compression
-    ttfb_ms = resp.elapsed.microseconds // 1000
+    ttfb_ms = int(resp.elapsed.total_seconds() * 1000)
     if ttfb_ms > 800:
         score -= 10
-        findings.append({"type": "warning", "msg": f"High TTFB: ~{ttfb_ms} ms. Consider a CDN or caching."})
+        findings.append(finding("ttfb.high", ttfb_ms=ttfb_ms))
     else:
-        findings.append({"type": "pass", "msg": f"TTFB looks OK (~{ttfb_ms} ms)."})
+        findings.append(finding("ttfb.ok", ttfb_ms=ttfb_ms))
 
     if "content-encoding" not in {k.lower() for k in resp.headers}:
         score -= 8
-        findings.append({"type": "warning", "msg": "Response not compressed (gzip/br). Enable compression."})
+        findings.append(finding("compression.missing"))
     else:
-        findings.append({"type": "pass", "msg": "Compression detected."})
+        findings.append(finding("compression.ok"))
 
     # Asset discovery
     html = resp.text or ""
     assets = parse_assets(html, base_url)
     total_assets = len(assets)
     if total_assets == 0:
-        findings.append({"type": "info", "msg": "No assets referenced (or could not parse)."})
+        findings.append(finding("assets.none"))
     else:
-        findings.append({"type": "info", "msg": f"Found {total_assets} assets (img/script/css). Checking up to {max_checks}."})
+        findings.append(finding("assets.found", found=total_assets, max_checks=max_checks))
 
-    # Asset sizes (HEAD/GET with content-length)
-    checked = assets[:max_checks]
-    total_bytes = 0
+    # Asset sizes (HEAD/GET with content-length). The load estimate depends on the
+    # render-blocking resources and eager images, so those are probed first.
+    graph = build_graph(html, base_url)
+    critical = [n["url"] for n in graph if n["blocking"]] + \
+               [n["url"] for n in graph if n["kind"] == "img" and not n["lazy"]]
+    checked = list(dict.fromkeys(critical + assets))[:max_checks]
+    sizes = {}
 
     with ThreadPoolExecutor(max_workers=10) as ex:
-        futs = {ex.submit(head_size, u, timeout=timeout, headers=headers): u for u in checked}
+        futs = {ex.submit(head_size, u, timeout=timeout, headers=headers, cancel=cancel): u for u in checked}
         for fut in as_completed(futs):
-            total_bytes += fut.result() or 0
+            sizes[futs[fut]] = fut.result() or 0
+    total_bytes = sum(sizes.values())
 
     kb = total_bytes // 1024
     if kb > 1500:
         score -= 15
-        findings.append({"type": "warning", "msg": f"Large total payload (~{kb} KB for first {len(checked)} assets). Consider minification, code splitting, and image optimization."})
+        findings.append(finding("payload.large", kb=kb, checked=len(checked)))
     else:
-        findings.append({"type": "pass", "msg": f"Total payload looks reasonable (~{kb} KB for checked assets)."})
+        findings.append(finding("payload.ok", kb=kb))
 
     # Mixed content
     if has_mixed_content(base_url, assets):
         score -= 12
-        findings.append({"type": "error", "msg": "Mixed content detected (HTTP assets on HTTPS page). Use HTTPS for all resources."})
+        findings.append(finding("mixed_content"))
+
+    # Simulated page load (FCP/LCP-style estimates without a browser)
+    sim = simulate(graph, sizes, ttfb_ms, len(resp.content or b""))
+    # Reported only: the model is not calibrated against Lighthouse yet, so it
+    # does not affect the score.
+    timings = {"lcp_ms": sim["lcp_ms"], "fcp_ms": sim["fcp_ms"]}
+    if sim["lcp_ms"] > 4000:
+        findings.append(finding("lcp.slow", render_blocking=sim["render_blocking"], **timings))
+    elif sim["lcp_ms"] > 2500:
+        findings.append(finding("lcp.needs_improvement", **timings))
+    else:
+        findings.append(finding("lcp.good", **timings))
 
     # Caching hints
     cache_hdrs = {k.lower(): v for k, v in resp.headers.items()}
     cc = cache_hdrs.get("cache-control", "")
     if "max-age" not in cc.lower():
         score -= 6
-        findings.append({"type": "warning", "msg": "No cache-control max-age on base document. Add caching where appropriate."})
+        findings.append(finding("cache.missing"))
     else:
-        findings.append({"type": "pass", "msg": "Cache-Control present on base document."})
+        findings.append(finding("cache.ok"))
 
     score = max(0, min(100, score))
-    return {
-        "score": score,
-        "grade": grade(score),
+    return Section(score, grade(score), findings, {
         "overview": {
             "assets_checked": len(checked),
             "assets_found": total_assets,
             "approx_kb": kb,
             "ttfb_ms": ttfb_ms
         },
-        "findings": findings
-    }
+        "simulated": sim,
+        "hosts": registry.snapshot({host_of(u) for u in checked}),
+    })
+
+
+def lighthouse_metrics(url: str, timeout: int = 120, cancel=None):
+    """Run a real Lighthouse audit. Slow (launches headless Chrome), so only on request.
+
+    Setting ``cancel`` (a threading.Event) kills the run.
+    """
+    fd, report_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    proc = None
+    try:
+        proc = subprocess.Popen(
+            ["lighthouse", url, "--quiet", "--chrome-flags=--headless",
+             "--only-categories=performance", "--output=json", f"--output-path={report_path}"]
+        )
+        deadline = time.monotonic() + timeout
+        while proc.poll() is None:
+            if cancel is not None and cancel.is_set():
+                raise RuntimeError("Lighthouse run cancelled")
+            if time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            time.sleep(0.2)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+        with open(report_path, "r") as f:
+            audits = json.load(f)["audits"]
+        return {
+            "fcp_ms": int(audits["first-contentful-paint"]["numericValue"]),
+            "lcp_ms": int(audits["largest-contentful-paint"]["numericValue"]),
+        }
+    except Exception as e:
+        return {"lighthouse_error": str(e)}
+    finally:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        os.remove(report_path)
@@ -0,0 +1,145 @@
+import json
+from dataclasses import dataclass, field
+import msgpack
+from .headerpolicy import POLICY_MESSAGES
+
+FORMAT_VERSION = 1
+
+# code -> (type, message template). Findings carry only the code and its
+# parameters; the English text is rendered when a result is displayed.
+MESSAGES = {
+    "https.missing": ("warning", "Site not served over HTTPS."),
+    "headers.missing": ("warning", "Missing security headers: {headers}"),
+    "headers.present": ("pass", "Present security headers: {headers}"),
+    "server.exposed": ("info", "Server header exposes: {server}. Consider minimizing version leakage."),
+    "powered_by.exposed": ("warning", "X-Powered-By present: {value}. Remove to reduce fingerprinting."),
+    "robots.block_all": ("info", "robots.txt blocks all crawling. Is this intentional?"),
+    "tls.unknown": ("info", "Could not determine TLS certificate expiry."),
+    "tls.expired": ("error", "TLS certificate expired."),
+    "tls.expiring": ("warning", "TLS certificate expires soon ({days} days)."),
+    "tls.valid": ("pass", "TLS certificate valid ({days} days remaining)."),
+    "ttfb.high": ("warning", "High TTFB: ~{ttfb_ms} ms. Consider a CDN or caching."),
+    "ttfb.ok": ("pass", "TTFB looks OK (~{ttfb_ms} ms)."),
+    "compression.missing": ("warning", "Response not compressed (gzip/br). Enable compression."),
+    "compression.ok": ("pass", "Compression detected."),
+    "assets.none": ("info", "No assets referenced (or could not parse)."),
+    "assets.found": ("info", "Found {found} assets (img/script/css). Checking up to {max_checks}."),
+    "payload.large": ("warning", "Large total payload (~{kb} KB for first {checked} assets). Consider minification, code splitting, and image optimization."),
+    "payload.ok": ("pass", "Total payload looks reasonable (~{kb} KB for checked assets)."),
+    "mixed_content": ("error", "Mixed content detected (HTTP assets on HTTPS page). Use HTTPS for all resources."),
+    "lcp.slow": ("info", "Slow estimated LCP (~{lcp_ms} ms, FCP ~{fcp_ms} ms). Reduce render-blocking resources ({render_blocking}) and hero image size."),
+    "lcp.needs_improvement": ("info", "Estimated LCP needs improvement (~{lcp_ms} ms, FCP ~{fcp_ms} ms)."),
+    "lcp.good": ("pass", "Estimated LCP looks good (~{lcp_ms} ms, FCP ~{fcp_ms} ms)."),
+    "cache.missing": ("warning", "No cache-control max-age on base document. Add caching where appropriate."),
+    "cache.ok": ("pass", "Cache-Control present on base document."),
+    **POLICY_MESSAGES,
+}
+
+# Wire ids are positions in this tuple: append only, never reorder or remove.
+WIRE_CODES = (
+    "https.missing", "headers.missing", "headers.present", "server.exposed",
+    "powered_by.exposed", "robots.block_all", "tls.unknown", "tls.expired",
+    "tls.expiring", "tls.valid", "ttfb.high", "ttfb.ok", "compression.missing",
+    "compression.ok", "assets.none", "assets.found", "payload.large", "payload.ok",
+    "mixed_content", "lcp.slow", "lcp.needs_improvement", "lcp.good",
+    "cache.missing", "cache.ok",
+    "csp.no_default_src", "csp.unsafe_inline", "csp.unsafe_eval", "csp.wildcard",
+    "csp.strict", "csp.no_object_src", "csp.frame_ancestors", "hsts.disabled",
+    "hsts.short", "hsts.ok", "hsts.preload_ineligible", "hsts.no_subdomains",
+    "referrer.unknown", "referrer.weak", "referrer.ok", "permissions.open",
+    "permissions.ok", "cookie.samesite_insecure", "cookie.missing_flags",
+)
+WIRE_IDS = {code: i for i, code in enumerate(WIRE_CODES)}
+if set(WIRE_CODES) != set(MESSAGES):
+    raise RuntimeError(f"Finding codes without a wire id (or stale wire ids): {sorted(set(WIRE_CODES) ^ set(MESSAGES))}")
+
+
+@dataclass(slots=True)
+class Finding:
+    code: str
+    params: dict = field(default_factory=dict)
+
+    @property
+    def type(self) -> str:
+        return MESSAGES[self.code][0]
+
+    @property
+    def msg(self) -> str:
+        return MESSAGES[self.code][1].format(**self.params)
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, "msg": self.msg, "code": self.code}
+
+
+def finding(code: str, **params) -> Finding:
+    return Finding(code, params)
+
+
+@dataclass(slots=True)
+class Section:
+    score: int
+    grade: str
+    findings: list
+    extra: dict = field(default_factory=dict)   # section-specific data, e.g. performance overview
+
+    def to_dict(self) -> dict:
+        return {"score": self.score, "grade": self.grade, **self.extra,
+                "findings": [f.to_dict() for f in self.findings]}
+
+    def to_wire(self) -> list:
+        return [self.score, self.grade, [[WIRE_IDS[f.code], f.params] for f in self.findings], self.extra]
+
+    @classmethod
+    def from_wire(cls, wire) -> "Section":
+        score, grade, findings, extra = wire
+        return cls(score, grade, [Finding(WIRE_CODES[i], params) for i, params in findings], extra)
+
+
+@dataclass(slots=True)
+class AuditResult:
+    input_url: str
+    final_url: str
+    status_code: int
+    overall: dict
+    security: Section
+    performance: Section
+    hosts: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """The /api/audit response shape, with findings rendered to text."""
+        return {
+            "input_url": self.input_url,
+            "final_url": self.final_url,
+            "status_code": self.status_code,
+            "overall": self.overall,
+            "security": self.security.to_dict(),
+            "performance": self.performance.to_dict(),
+            "hosts": self.hosts,
+        }
+
+    def to_wire(self) -> list:
+        return [FORMAT_VERSION, self.input_url, self.final_url, self.status_code,
+                self.overall["score"], self.overall["grade"],
+                self.security.to_wire(), self.performance.to_wire(), self.hosts]
+
+    @classmethod
+    def from_wire(cls, wire) -> "AuditResult":
+        version, input_url, final_url, status_code, score, grade, security, performance, hosts = wire
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported audit result format version: {version}")
+        return cls(input_url, final_url, status_code, {"score": score, "grade": grade},
+                   Section.from_wire(security), Section.from_wire(performance), hosts)
+
+    def to_msgpack(self) -> bytes:
+        return msgpack.packb(self.to_wire(), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "AuditResult":
+        return cls.from_wire(msgpack.unpackb(data, raw=False))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_wire(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: str) -> "AuditResult":
+        return cls.from_wire(json.loads(data))
@@ -1,6 +1,8 @@
 from urllib.parse import urlparse, urljoin
 import requests
 from .utils import days_until_cert_expiry, get_domain, get_scheme
+from .headerpolicy import evaluate_policies, set_cookie_headers
+from .results import Finding, Section, finding
 
 SEC_HEADERS = [
     "content-security-policy",
@@ -11,31 +13,17 @@ SEC_HEADERS = [
     "permissions-policy",
 ]
 
-def analyze_security(resp, base_url: str, robots_text: str | None):
+def check_headers(resp):
+    """Checks that only need the fetched response. Returns (deduction, findings)."""
     headers = {k.lower(): v for k, v in resp.headers.items()}
     findings = []
-    score = 100
+    deduction = 0
 
     # HTTPS + redirect
     scheme = get_scheme(resp.url)
     if scheme != "https":
-        score -= 15
-        findings.append({"type": "warning", "msg": "Site not served over HTTPS."})
-
-    # TLS expiry days
-    days = days_until_cert_expiry(get_domain(base_url))
-    if days is None:
-        score -= 5
-        findings.append({"type": "info", "msg": "Could not determine TLS certificate expiry."})
-    else:
-        if days < 0:
-            score -= 30
-            findings.append({"type": "error", "msg": "TLS certificate expired."})
-        elif days < 15:
-            score -= 15
-            findings.append({"type": "warning", "msg": f"TLS certificate expires soon ({days} days)."})
-        else:
-            findings.append({"type": "pass", "msg": f"TLS certificate valid ({days} days remaining)."})
+        deduction += 15
+        findings.append(finding("https.missing"))
 
     # Security headers
     missing = []
@@ -47,32 +35,60 @@ def analyze_security(resp, base_url: str, robots_text: str | None):
             missing.append(h)
 
     if missing:
-        score -= min(30, 5 * len(missing))
-        findings.append({"type": "warning", "msg": f"Missing security headers: {', '.join(missing)}"})
+        deduction += min(30, 5 * len(missing))
+        findings.append(finding("headers.missing", headers=", ".join(missing)))
     if good:
-        findings.append({"type": "pass", "msg": f"Present security headers: {', '.join(good)}"})
+        findings.append(finding("headers.present", headers=", ".join(good)))
+
+    # Policy values (CSP, HSTS, Referrer/Permissions-Policy, cookie flags)
+    policy_findings, penalty = evaluate_policies(headers, set_cookie_headers(resp))
+    deduction += min(25, penalty)
+    findings.extend(Finding(code, params) for code, params in policy_findings)
 
     # Server info leakage
     if "server" in headers:
-        findings.append({"type": "info", "msg": f"Server header exposes: {headers['server']}. Consider minimizing version leakage."})
+        findings.append(finding("server.exposed", server=headers["server"]))
 
     # X-Powered-By leakage
     if "x-powered-by" in headers:
-        score -= 5
-        findings.append({"type": "warning", "msg": f"X-Powered-By present: {headers['x-powered-by']}. Remove to reduce fingerprinting."})
-
-    # robots.txt sanity (optional)
-    if robots_text is not None:
-        if "disallow: /" in robots_text.lower():
-            findings.append({"type": "info", "msg": "robots.txt blocks all crawling. Is this intentional?"})
-
-    score = max(0, min(100, score))
-    return {
-        "score": score,
-        "grade": "A+" if score >= 95 else
-                 "A" if score >= 85 else
-                 "B" if score >= 75 else
-                 "C" if score >= 65 else
-                 "D" if score >= 55 else "F",
-        "findings": findings
-    }
+        deduction += 5
+        findings.append(finding("powered_by.exposed", value=headers["x-powered-by"]))
+
+    return deduction, findings
+
+
+def check_robots(robots_text: str | None):
+    """robots.txt sanity (optional). Returns (deduction, findings)."""
+    if robots_text is not None and "disallow: /" in robots_text.lower():
+        return 0, [finding("robots.block_all")]
+    return 0, []
+
+
+def check_tls(base_url: str):
+    """Certificate checks; opens a separate TLS connection. Returns (deduction, findings)."""
+    days = days_until_cert_expiry(get_domain(base_url))
+    if days is None:
+        return 5, [finding("tls.unknown")]
+    if days < 0:
+        return 30, [finding("tls.expired")]
+    if days < 15:
+        return 15, [finding("tls.expiring", days=days)]
+    return 0, [finding("tls.valid", days=days)]
+
+
+def summarize(deduction: int, findings: list):
+    score = max(0, min(100, 100 - deduction))
+    return Section(
+        score,
+        "A+" if score >= 95 else
+        "A" if score >= 85 else
+        "B" if score >= 75 else
+        "C" if score >= 65 else
+        "D" if score >= 55 else "F",
+        findings
+    )
+
+
+def analyze_security(resp, base_url: str, robots_text: str | None):
+    parts = [check_headers(resp), check_robots(robots_text), check_tls(base_url)]
+    return summarize(sum(d for d, _ in parts), [f for _, findings in parts for f in findings])
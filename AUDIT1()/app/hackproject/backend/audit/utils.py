@@ -1,11 +1,13 @@
 import re
 import socket
 import ssl
+import threading
 import time
 from urllib.parse import urlparse, urljoin
 import requests
 from bs4 import BeautifulSoup
 from typing import List, Optional
+from .hosthealth import registry, guarded_request
 
 
 def normalize_url(url: str) -> str:
@@ -17,16 +19,21 @@ def normalize_url(url: str) -> str:
 
 def fetch(url: str, *, timeout: int = 10, allow_redirects: bool = True, headers: dict = None):
     start = time.perf_counter()
-    resp = requests.get(url, timeout=timeout, allow_redirects=allow_redirects, headers=headers)
+    resp = guarded_request("GET", url, timeout=timeout, allow_redirects=allow_redirects, headers=headers)
     elapsed_ms = int((time.perf_counter() - start) * 1000)
     return resp, elapsed_ms
 
 
-def head_size(url: str, *, timeout: int = 10, headers: dict = None) -> int:
+def head_size(url: str, *, timeout: int = 10, headers: dict = None, cancel: threading.Event = None) -> int:
+    # a cancelled audit drains its queued probes without touching the network
+    if cancel is not None and cancel.is_set():
+        return 0
     try:
-        r = requests.head(url, timeout=timeout, allow_redirects=True, headers=headers)
+        r = guarded_request("HEAD", url, timeout=timeout, allow_redirects=True, headers=headers)
+        if cancel is not None and cancel.is_set():
+            return int(r.headers.get("content-length") or 0)
         if r.status_code >= 400 or "content-length" not in r.headers:
-            r2 = requests.get(url, timeout=timeout, allow_redirects=True, headers=headers)
+            r2 = guarded_request("GET", url, timeout=timeout, retries=0, allow_redirects=True, headers=headers)
             return int(r2.headers.get("content-length") or 0)
         return int(r.headers.get("content-length") or 0)
     except Exception:
@@ -41,16 +48,22 @@ def get_scheme(url: str) -> str:
     return urlparse(url).scheme
 
 
+def is_fetchable(href: Optional[str]) -> bool:
+    """False for references that never hit the network: empty, data: and blob: URLs."""
+    href = (href or "").strip()
+    return bool(href) and not href.lower().startswith(("data:", "blob:"))
+
+
 def parse_assets(html: str, base_url: str) -> List[str]:
     soup = BeautifulSoup(html, "html.parser")
-    assets = set()
+    assets = {}     # insertion-ordered set: document order per tag, stable between runs
 
     for tag, attr in [("img", "src"), ("script", "src"), ("link", "href")]:
         for el in soup.find_all(tag):
             href = el.get(attr)
-            if href:
-                abs_url = urljoin(base_url, href)
-                assets.add(abs_url)
+            if is_fetchable(href):
+                abs_url = urljoin(base_url, href.strip())
+                assets[abs_url] = None
 
     return list(assets)
 
@@ -62,18 +75,28 @@ def has_mixed_content(base_url: str, assets: List[str]) -> bool:
 
 
 def days_until_cert_expiry(hostname: str, port: int = 443) -> Optional[int]:
+    key = f"{hostname}:{port}"   # TLS endpoint, tracked apart from the HTTP host
+    admission = registry.admit(key)
+    if admission is None:
+        return None
+    start = time.perf_counter()
     try:
         ctx = ssl.create_default_context()
-        with socket.create_connection((hostname, port), timeout=8) as sock:
+        with socket.create_connection((hostname, port), timeout=registry.timeout_for(key, 8)) as sock:
             with ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
                 cert = ssock.getpeercert()
+                registry.record(key, (time.perf_counter() - start) * 1000)
                 not_after = cert.get("notAfter")
                 if not_after:
                     from datetime import datetime
                     expires = datetime.strptime(not_after, "%b %d %H:%M:%S %Y %Z")
                     return (expires - datetime.utcnow()).days
     except Exception:
+        registry.record(key, ok=False)
         return None
+    finally:
+        if admission == "probe":
+            registry.end_probe(key)
     return None
 
 
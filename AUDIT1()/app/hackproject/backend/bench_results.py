@@ -0,0 +1,61 @@
+"""Storage size and (de)serialization time of an audit result per format.
+
+Run from the backend directory:  python bench_results.py [iterations]
+"""
+import json
+import sys
+import timeit
+
+from audit.results import AuditResult, Section, finding
+
+
+def sample_result() -> AuditResult:
+    security = Section(62, "D", [
+        finding("headers.missing", headers="content-security-policy, permissions-policy"),
+        finding("headers.present", headers="strict-transport-security, x-content-type-options, x-frame-options, referrer-policy"),
+        finding("hsts.ok", days=365),
+        finding("hsts.no_subdomains"),
+        finding("referrer.ok", policy="strict-origin-when-cross-origin"),
+        finding("cookie.missing_flags", name="session-id", flags="HttpOnly, SameSite"),
+        finding("server.exposed", server="nginx/1.24.0"),
+        finding("tls.valid", days=71),
+    ])
+    performance = Section(79, "B", [
+        finding("ttfb.ok", ttfb_ms=212),
+        finding("compression.ok"),
+        finding("assets.found", found=57, max_checks=40),
+        finding("payload.large", kb=2210, checked=40),
+        finding("lcp.needs_improvement", lcp_ms=3120, fcp_ms=1480),
+        finding("cache.missing"),
+    ], {
+        "overview": {"assets_checked": 40, "assets_found": 57, "approx_kb": 2210, "ttfb_ms": 212},
+        "simulated": {"fcp_ms": 1480, "lcp_ms": 3120, "load_ms": 4630, "render_blocking": 4,
+                      "lazy_images": 12, "requests": 41, "unknown_sizes": 2,
+                      "model": {"rtt_ms": 150, "throughput_kbps": 1638.4, "max_connections": 6}},
+        "hosts": {"cdn.example.com": {"state": "closed", "p50_ms": 38, "p95_ms": 120, "requests": 31,
+                                      "failures": 0, "retries": 0, "short_circuited": 0}},
+    })
+    return AuditResult("example.com", "https://www.example.com/", 200, {"score": 70, "grade": "C"},
+                       security, performance,
+                       {"www.example.com": {"state": "closed", "p50_ms": 212, "p95_ms": 212, "requests": 2,
+                                            "failures": 0, "retries": 0, "short_circuited": 0}})
+
+
+def main(iterations: int = 20000):
+    result = sample_result()
+    formats = {
+        "json (indent=2, rendered)": (lambda: json.dumps(result.to_dict(), indent=2), json.loads),
+        "json (compact, codes)": (result.to_json, AuditResult.from_json),
+        "msgpack (codes)": (result.to_msgpack, AuditResult.from_msgpack),
+    }
+    print(f"{'format':<28}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, (encode, decode) in formats.items():
+        blob = encode()
+        size = len(blob.encode() if isinstance(blob, str) else blob)
+        enc = timeit.timeit(encode, number=iterations) / iterations * 1e6
+        dec = timeit.timeit(lambda: decode(blob), number=iterations) / iterations * 1e6
+        print(f"{name:<28}{size:>8}{enc:>12.1f}{dec:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
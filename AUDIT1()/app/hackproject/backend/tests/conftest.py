@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app.py imports the backend modules as top-level packages ("audit", "config")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,160 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from audit import hosthealth, utils
+from audit.hosthealth import HostRegistry, HostUnavailable, guarded_request
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    reg = HostRegistry()
+    monkeypatch.setattr(hosthealth, "registry", reg)
+    monkeypatch.setattr(utils, "registry", reg)
+    monkeypatch.setattr(hosthealth, "BACKOFF_BASE", 0)
+    return reg
+
+
+def test_head_501_does_not_trip_breaker(monkeypatch, fresh_registry):
+    calls = {"HEAD": 0, "GET": 0}
+    lock = threading.Lock()
+
+    def fake_request(method, url, **kwargs):
+        with lock:
+            calls[method] += 1
+        if method == "HEAD":
+            return FakeResponse(501)
+        return FakeResponse(200, {"content-length": "1024"})
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    assets = [f"https://site.com/a{i}.js" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=10) as ex:
+        sizes = list(ex.map(lambda u: utils.head_size(u, timeout=5), assets))
+
+    assert sizes == [1024] * 40
+    assert calls == {"HEAD": 40, "GET": 40}     # no retries of a 501
+    assert fresh_registry.snapshot()["site.com"]["state"] == "closed"
+    assert guarded_request("GET", "https://site.com/").status_code == 200
+
+
+def test_connection_errors_open_breaker(monkeypatch, fresh_registry):
+    def fake_request(method, url, **kwargs):
+        raise requests.exceptions.ConnectTimeout("down")
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    for _ in range(hosthealth.BREAKER_FAILURES):
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            guarded_request("GET", "https://dead.example/", retries=0)
+    with pytest.raises(HostUnavailable):
+        guarded_request("GET", "https://dead.example/")
+    assert fresh_registry.snapshot()["dead.example"]["state"] == "open"
+
+
+def test_503_is_retried_but_404_is_not(monkeypatch):
+    statuses = {"/busy": [503, 200], "/missing": [404, 200]}
+    seen = []
+
+    def fake_request(method, url, **kwargs):
+        path = url.split("site.com")[1]
+        seen.append(path)
+        return FakeResponse(statuses[path].pop(0))
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    assert guarded_request("GET", "https://site.com/busy").status_code == 200
+    assert guarded_request("GET", "https://site.com/missing").status_code == 404
+    assert seen == ["/busy", "/busy", "/missing"]
+
+
+def test_read_timeout_is_not_retried(monkeypatch):
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(url)
+        raise requests.exceptions.ReadTimeout("hung")
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        guarded_request("GET", "https://hangs.example/")
+    assert len(calls) == 1
+
+
+def test_retries_share_one_deadline(monkeypatch):
+    clock = {"now": 1000.0}
+    timeouts = []
+
+    def fake_request(method, url, timeout, **kwargs):
+        timeouts.append(timeout)
+        clock["now"] += timeout      # every connect attempt uses up its whole timeout
+        raise requests.exceptions.ConnectTimeout("no answer")
+
+    monkeypatch.setattr(hosthealth.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(requests, "request", fake_request)
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        guarded_request("GET", "https://slow.example/", timeout=10)
+    assert sum(timeouts) <= 10
+    assert len(timeouts) == 1       # nothing left of the deadline for a retry
+
+
+def test_idle_hosts_are_evicted(monkeypatch, fresh_registry):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(hosthealth.time, "monotonic", lambda: clock["now"])
+    fresh_registry.record("idle.example", 10)
+    for _ in range(hosthealth.BREAKER_FAILURES):
+        fresh_registry.record("dead.example", ok=False)
+
+    clock["now"] += hosthealth.HOST_IDLE_TTL
+    fresh_registry.record("busy.example", 10)
+    # the open breaker is kept so the dead host stays short-circuited
+    assert set(fresh_registry.snapshot()) == {"dead.example", "busy.example"}
+
+
+def test_host_count_is_bounded(monkeypatch, fresh_registry):
+    monkeypatch.setattr(hosthealth, "MAX_HOSTS", 3)
+    for i in range(5):
+        fresh_registry.record(f"h{i}", 10)
+    fresh_registry.record("h2", 10)     # recently used, so kept
+    fresh_registry.record("h5", 10)
+    assert list(fresh_registry.snapshot()) == ["h4", "h2", "h5"]
+
+
+def test_urls_without_host_are_not_tracked(monkeypatch, fresh_registry):
+    monkeypatch.setattr(requests, "request", lambda method, url, **kw: FakeResponse(200))
+    guarded_request("GET", "data:image/png;base64,AAAA")
+    assert fresh_registry.snapshot() == {}
+
+
+def open_breaker(reg, host, monkeypatch):
+    # a fixed clock, so the cooldown check below is exact
+    monkeypatch.setattr(hosthealth.time, "monotonic", lambda: 1000.0)
+    for _ in range(hosthealth.BREAKER_FAILURES):
+        reg.record(host, ok=False)
+    # pretend the cooldown has passed
+    monkeypatch.setattr(hosthealth.time, "monotonic", lambda: 1000.0 + hosthealth.BREAKER_COOLDOWN)
+
+
+def test_only_one_half_open_probe(monkeypatch, fresh_registry):
+    open_breaker(fresh_registry, "h", monkeypatch)
+    assert fresh_registry.admit("h") == "probe"
+    # an unrelated request that was in flight when the breaker opened finishes
+    fresh_registry.record("h", ok=False)
+    assert fresh_registry.admit("h") is None
+
+
+def test_probe_released_on_unexpected_error(monkeypatch, fresh_registry):
+    open_breaker(fresh_registry, "site.com", monkeypatch)
+
+    def fake_request(method, url, **kwargs):
+        raise ValueError("bug in a hook")
+
+    monkeypatch.setattr(requests, "request", fake_request)
+    with pytest.raises(ValueError):
+        guarded_request("GET", "https://site.com/")
+    assert fresh_registry.admit("site.com") == "probe"
@@ -0,0 +1,128 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from audit import performance
+from audit.pageload import build_graph, simulate
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "pageload")
+BASE = "http://127.0.0.1/"
+
+with open(os.path.join(FIXTURES, "expected.json"), "r") as f:
+    EXPECTED = json.load(f)
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        html = f.read()
+    spec = EXPECTED[name]
+    sizes = {BASE.rstrip("/") + path: size for path, size in spec["sizes"].items()}
+    return build_graph(html, BASE), sizes, spec
+
+
+def by_url(nodes):
+    return {n["url"].replace(BASE.rstrip("/"), ""): n for n in nodes}
+
+
+def test_head_css_and_scripts_block_render():
+    nodes = by_url(load("blocking.html")[0])
+    assert nodes["/css/site.css"]["blocking"]
+    assert not nodes["/css/print.css"]["blocking"]
+    assert nodes["/js/vendor.js"]["blocking"] and nodes["/js/app.js"]["blocking"]
+    assert not nodes["/img/hero.png"]["blocking"]
+
+
+def test_async_defer_module_and_body_scripts_do_not_block():
+    nodes = by_url(load("async.html")[0])
+    for path in ("/js/vendor.js", "/js/analytics.js", "/js/app.js", "/js/footer.js"):
+        assert not nodes[path]["blocking"], path
+    assert nodes["/css/site.css"]["blocking"]
+
+
+def test_lazy_images_are_left_out_of_the_load():
+    nodes, sizes, spec = load("async.html")
+    lazy = [n["url"] for n in nodes if n["lazy"]]
+    assert sorted(u.rsplit("/", 1)[1] for u in lazy) == ["below1.png", "below2.png"]
+
+    eager = [n for n in nodes if not n["lazy"]]
+    with_lazy = simulate(nodes, sizes, spec["ttfb_ms"], 2000)
+    without = simulate(eager, sizes, spec["ttfb_ms"], 2000)
+    assert with_lazy["requests"] == without["requests"] == len(eager) + 1
+    assert with_lazy["load_ms"] == without["load_ms"]
+    assert with_lazy["lazy_images"] == 2
+
+
+def test_blocking_resources_delay_fcp():
+    blocking, sizes, spec = load("blocking.html")
+    freed = [dict(n, blocking=False) for n in blocking]
+    assert simulate(blocking, sizes, spec["ttfb_ms"], 2000)["fcp_ms"] > \
+        simulate(freed, sizes, spec["ttfb_ms"], 2000)["fcp_ms"]
+
+
+def test_connection_limit_queues_requests():
+    nodes = [{"url": f"https://cdn.test/{i}.png", "kind": "img", "blocking": False, "lazy": False}
+             for i in range(12)]
+    sizes = {n["url"]: 1 for n in nodes}     # latency-bound, bandwidth is irrelevant
+    args = (nodes, sizes, 0, 0)
+    one_wave = simulate(*args, rtt_ms=100, max_connections=12)["load_ms"]
+    two_waves = simulate(*args, rtt_ms=100, max_connections=6)["load_ms"]
+    # second wave reuses warm connections: one extra RTT, no new handshakes
+    assert one_wave == pytest.approx(300, abs=1)
+    assert two_waves == pytest.approx(400, abs=1)
+
+
+def test_no_nodes():
+    result = simulate([], {}, 200, 16384, rtt_ms=150, throughput_kbps=1638.4)
+    doc_end = 200 + 16384 * 8 / 1638.4
+    assert result["requests"] == 1
+    assert result["render_blocking"] == 0
+    assert result["load_ms"] == int(doc_end)
+    assert result["fcp_ms"] == result["lcp_ms"]
+
+
+def test_inline_and_empty_references_are_not_requests():
+    html = """<html><head>
+      <link rel="stylesheet" href="data:text/css,body{}">
+      <script src=""></script>
+      <script src="blob:http://127.0.0.1/1234"></script>
+      <link rel="stylesheet" href="/css/site.css">
+    </head><body><img src="data:image/png;base64,AAAA"></body></html>"""
+    nodes = build_graph(html, BASE)
+    assert [n["url"] for n in nodes] == ["http://127.0.0.1/css/site.css"]
+
+
+def test_unknown_sizes_are_reported():
+    nodes, sizes, spec = load("blocking.html")
+    assert simulate(nodes, sizes, spec["ttfb_ms"], 2000)["unknown_sizes"] == 0
+    del sizes["http://127.0.0.1/img/hero.png"]
+    assert simulate(nodes, sizes, spec["ttfb_ms"], 2000)["unknown_sizes"] == 1
+
+
+class FakePage:
+    url = BASE
+    status_code = 200
+    headers = {"Cache-Control": "max-age=60", "Content-Encoding": "gzip"}
+    elapsed = datetime.timedelta(milliseconds=200)
+
+    def __init__(self, html):
+        self.text = html
+        self.content = html.encode()
+
+
+def test_critical_assets_are_probed_first(monkeypatch):
+    # many body images before the hero: a plain first-N cut would miss the head resources
+    filler = "".join(f'<img src="/img/thumb{i}.png" loading="lazy">' for i in range(50))
+    html = f"""<html><head><link rel="stylesheet" href="/css/site.css"></head>
+      <body>{filler}<img src="/img/hero.png"><script src="/js/app.js" defer></script></body></html>"""
+    probed = []
+
+    def fake_head_size(url, **kw):
+        probed.append(url)
+        return 1000
+
+    monkeypatch.setattr(performance, "head_size", fake_head_size)
+    section = performance.analyze_performance(FakePage(html), BASE, max_checks=3, timeout=1)
+    assert sorted(probed) == [BASE + "css/site.css", BASE + "img/hero.png", BASE + "img/thumb0.png"]
+    assert section.extra["simulated"]["unknown_sizes"] == 1      # the deferred script
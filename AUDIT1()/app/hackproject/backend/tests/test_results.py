@@ -0,0 +1,75 @@
+import msgpack
+import pytest
+
+import app as backend
+from audit import results
+from audit.results import AuditResult, FORMAT_VERSION, Section, finding
+from bench_results import sample_result
+
+
+def test_every_code_has_a_wire_id():
+    assert set(results.WIRE_CODES) == set(results.MESSAGES)
+    assert len(results.WIRE_CODES) == len(set(results.WIRE_CODES))
+
+
+def test_msgpack_round_trip():
+    result = sample_result()
+    decoded = AuditResult.from_msgpack(result.to_msgpack())
+    assert decoded == result
+    assert decoded.to_dict() == result.to_dict()
+
+
+def test_json_round_trip():
+    result = sample_result()
+    decoded = AuditResult.from_json(result.to_json())
+    assert decoded == result
+    assert decoded.to_dict() == result.to_dict()
+
+
+def test_wire_form_uses_codes_not_messages():
+    result = sample_result()
+    assert b"Consider minimizing version leakage" not in result.to_msgpack()
+    assert "Consider minimizing version leakage" in str(result.to_dict())
+
+
+def test_version_mismatch_is_rejected():
+    wire = sample_result().to_wire()
+    wire[0] = FORMAT_VERSION + 1
+    with pytest.raises(ValueError, match="format version"):
+        AuditResult.from_msgpack(msgpack.packb(wire, use_bin_type=True))
+
+
+def test_rendered_finding():
+    f = finding("tls.expiring", days=3)
+    assert f.to_dict() == {"type": "warning", "msg": "TLS certificate expires soon (3 days).",
+                           "code": "tls.expiring"}
+
+
+class FakeResponse:
+    url = "https://site.com/"
+    status_code = 200
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, "guarded_request", lambda *a, **kw: FakeResponse())
+    monkeypatch.setattr(backend, "fetch_robots", lambda resp, headers: None)
+    monkeypatch.setattr(backend, "analyze_security", lambda *a: Section(90, "A", [finding("tls.valid", days=90)]))
+    monkeypatch.setattr(backend, "run_performance", lambda *a: Section(80, "A", []))
+    return backend.app.test_client()
+
+
+@pytest.mark.parametrize("accept, mimetype", [
+    ("application/msgpack", "application/msgpack"),
+    ("application/json", "application/json"),
+    ("application/json, application/msgpack;q=0.5", "application/json"),
+    ("application/msgpack, application/json;q=0.5", "application/msgpack"),
+    ("*/*", "application/json"),
+    (None, "application/json"),
+])
+def test_audit_content_negotiation(client, accept, mimetype):
+    headers = {"Accept": accept} if accept else {}
+    resp = client.post("/api/audit", json={"url": "site.com"}, headers=headers)
+    assert resp.mimetype == mimetype
+    if mimetype == "application/msgpack":
+        assert AuditResult.from_msgpack(resp.data).security.score == 90
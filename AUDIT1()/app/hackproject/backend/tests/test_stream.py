@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app as backend
+from audit.results import Section, finding
+
+
+class FakeResponse:
+    url = "https://site.com/"
+    status_code = 200
+    headers = {"Content-Type": "text/html"}
+    raw = None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, "guarded_request", lambda *a, **kw: FakeResponse())
+    monkeypatch.setattr(backend, "check_tls", lambda url: (0, [finding("tls.valid", days=90)]))
+    return backend.app.test_client()
+
+
+def read_lines(resp):
+    """Yield (seconds since start, parsed line) as the body streams in."""
+    start = time.perf_counter()
+    buf = b""
+    for chunk in resp.response:
+        buf += chunk
+        while b"\n" in buf:
+            line, buf = buf.split(b"\n", 1)
+            yield time.perf_counter() - start, json.loads(line)
+
+
+def test_headers_sent_before_slow_robots(client, monkeypatch):
+    def slow_robots(resp, headers):
+        time.sleep(0.5)
+        return "User-agent: *\nDisallow: /"
+
+    monkeypatch.setattr(backend, "fetch_robots", slow_robots)
+    monkeypatch.setattr(backend, "run_performance", lambda *a: Section(100, "A+", []))
+    resp = client.post("/api/audit/stream", json={"url": "site.com"}, buffered=False)
+    lines = list(read_lines(resp))
+
+    sections = [msg["section"] for _, msg in lines]
+    assert sections == ["page", "headers", "robots", "tls", "security", "performance", "overall"]
+    assert lines[1][0] < 0.3
+    assert [f["code"] for f in lines[2][1]["findings"]] == ["robots.block_all"]
+    assert [f["code"] for f in lines[3][1]["findings"]] == ["tls.valid"]
+    assert set(lines[4][1]["security"]) == {"score", "grade"}
+
+
+def test_failure_is_reported(client, monkeypatch):
+    def broken(*a):
+        raise RuntimeError("probe pool exploded")
+
+    monkeypatch.setattr(backend, "fetch_robots", lambda resp, headers: None)
+    monkeypatch.setattr(backend, "run_performance", broken)
+    resp = client.post("/api/audit/stream", json={"url": "site.com"})
+    last = json.loads(resp.data.splitlines()[-1])
+    assert last["section"] == "error"
+    assert "probe pool exploded" in last["error"]
+
+
+def test_disconnect_cancels_performance(client, monkeypatch):
+    seen = {}
+    started = threading.Event()
+
+    def slow_performance(resp, headers, lighthouse, cancel):
+        seen["cancel"] = cancel
+        started.set()
+        cancel.wait(5)
+        return Section(100, "A+", [])
+
+    monkeypatch.setattr(backend, "fetch_robots", lambda resp, headers: None)
+    monkeypatch.setattr(backend, "run_performance", slow_performance)
+    resp = client.post("/api/audit/stream", json={"url": "site.com"}, buffered=False)
+    body = iter(resp.response)
+    next(body)                  # "page" line
+    started.wait(1)
+    resp.close()                # client went away
+    assert seen["cancel"].is_set()
+
+
+def test_cancelled_probes_skip_network(monkeypatch):
+    from audit import utils
+
+    def no_network(*a, **kw):
+        raise AssertionError("probe ran after cancel")
+
+    monkeypatch.setattr(utils, "guarded_request", no_network)
+    cancel = threading.Event()
+    cancel.set()
+    assert utils.head_size("https://site.com/a.js", cancel=cancel) == 0
@@ -17,18 +17,80 @@ const li = (f) => {
   return el;
 };
 
+const cancelBtn = document.getElementById("cancel-btn");
+let controller = null;
+
+// Each NDJSON line is one finished section of the audit.
+const render = {
+  page(d) {
+    document.getElementById("final-url").textContent = d.final_url;
+    document.getElementById("status-code").textContent = d.status_code;
+    document.getElementById("sec-findings").innerHTML = "";
+    document.getElementById("perf-findings").innerHTML = "";
+    summary.hidden = false;
+  },
+  headers(d) {
+    const sf = document.getElementById("sec-findings");
+    d.findings.forEach(f => sf.appendChild(li(f)));
+  },
+  robots(d) {
+    render.headers(d);
+  },
+  tls(d) {
+    render.headers(d);
+  },
+  security(d) {
+    document.getElementById("sec-score").textContent = d.security.score;
+    setBadge(document.getElementById("sec-grade"), d.security.grade);
+  },
+  performance({ performance }) {
+    document.getElementById("perf-score").textContent = performance.score;
+    setBadge(document.getElementById("perf-grade"), performance.grade);
+    const po = performance.overview;
+    document.getElementById("perf-overview").textContent =
+      `Assets checked: ${po.assets_checked} of ${po.assets_found} • Payload ~${po.approx_kb} KB • TTFB ~${po.ttfb_ms} ms` +
+      (performance.simulated ? ` • Est. FCP ~${performance.simulated.fcp_ms} ms • Est. LCP ~${performance.simulated.lcp_ms} ms` +
+        (performance.simulated.unknown_sizes ? ` (${performance.simulated.unknown_sizes} assets of unknown size)` : "") : "");
+    const pf = document.getElementById("perf-findings");
+    performance.findings.forEach(f => pf.appendChild(li(f)));
+  },
+  error(d) {
+    errorBox.textContent = d.error;
+    errorBox.hidden = false;
+  },
+  overall(d) {
+    document.getElementById("overall-score").textContent = d.overall.score;
+    setBadge(document.getElementById("overall-grade"), d.overall.grade);
+    loading.hidden = true;
+  },
+};
+
+const resetScores = () => {
+  ["overall", "sec", "perf"].forEach(k => {
+    document.getElementById(`${k}-score`).textContent = "…";
+    setBadge(document.getElementById(`${k}-grade`), "—");
+  });
+  document.getElementById("perf-overview").textContent = "";
+};
+
+cancelBtn.addEventListener("click", () => controller && controller.abort());
+
 form.addEventListener("submit", async (e) => {
   e.preventDefault();
   errorBox.hidden = true;
   summary.hidden = true;
   loading.hidden = false;
   btn.disabled = true;
+  cancelBtn.hidden = false;
+  resetScores();
+  controller = new AbortController();
 
   try {
-    const res = await fetch("http://127.0.0.1:5000/api/audit", {
+    const res = await fetch("http://127.0.0.1:5000/api/audit/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ url: urlInput.value.trim() }),
+      signal: controller.signal,
     });
 
     if (!res.ok) {
@@ -36,37 +98,31 @@ form.addEventListener("submit", async (e) => {
       throw new Error(t.error || `Request failed (${res.status})`);
     }
 
-    const data = await res.json();
-
-    // Overall
-    document.getElementById("overall-score").textContent = data.overall.score;
-    setBadge(document.getElementById("overall-grade"), data.overall.grade);
-    document.getElementById("final-url").textContent = data.final_url;
-    document.getElementById("status-code").textContent = data.status_code;
-
-    // Security
-    document.getElementById("sec-score").textContent = data.security.score;
-    setBadge(document.getElementById("sec-grade"), data.security.grade);
-    const sf = document.getElementById("sec-findings");
-    sf.innerHTML = "";
-    data.security.findings.forEach(f => sf.appendChild(li(f)));
-
-    // Performance
-    document.getElementById("perf-score").textContent = data.performance.score;
-    setBadge(document.getElementById("perf-grade"), data.performance.grade);
-    const po = data.performance.overview;
-    document.getElementById("perf-overview").textContent =
-      `Assets checked: ${po.assets_checked} of ${data.performance.overview.assets_found} • Payload ~${po.approx_kb} KB • TTFB ~${po.ttfb_ms} ms`;
-    const pf = document.getElementById("perf-findings");
-    pf.innerHTML = "";
-    data.performance.findings.forEach(f => pf.appendChild(li(f)));
-
-    summary.hidden = false;
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buf = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buf += decoder.decode(value, { stream: true });
+      let nl;
+      while ((nl = buf.indexOf("\n")) >= 0) {
+        const line = buf.slice(0, nl).trim();
+        buf = buf.slice(nl + 1);
+        if (!line) continue;
+        const msg = JSON.parse(line);
+        (render[msg.section] || (() => {}))(msg);
+      }
+    }
   } catch (err) {
-    errorBox.textContent = err.message || String(err);
-    errorBox.hidden = false;
+    if (err.name !== "AbortError") {
+      errorBox.textContent = err.message || String(err);
+      errorBox.hidden = false;
+    }
   } finally {
     loading.hidden = true;
     btn.disabled = false;
+    cancelBtn.hidden = true;
+    controller = null;
   }
 });
@@ -0,0 +1,32 @@
+"""Check that vendored copies still match the file they were copied from.
+
+The leading comment block is skipped: it says which file is the canonical one.
+Run from the repo root:  python check_vendored.py
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# canonical file -> vendored copy
+VENDORED = {
+    "AUDIT1()/app/hackproject/backend/audit/headerpolicy.py": "site-audit/audit_modules/headerpolicy.py",
+}
+
+
+def code(path: str) -> bytes:
+    with open(os.path.join(ROOT, path), "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    while lines and lines[0].startswith(b"#"):
+        lines.pop(0)
+    return b"".join(lines)
+
+
+def main() -> int:
+    stale = [(source, copy) for source, copy in VENDORED.items() if code(source) != code(copy)]
+    for source, copy in stale:
+        print(f"{copy} differs from {source}; copy the code below the header over")
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
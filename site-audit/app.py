@@ -1,9 +1,11 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, make_response
+from flask import Flask, render_template, request, redirect, url_for, flash, make_response
 import requests, json, os, csv
 from bs4 import BeautifulSoup
 from datetime import datetime
 from io import StringIO
 import pdfkit
+from audit_modules.security import check_headers
+from audit_modules.report_store import add_history, load_history, save_latest, load_latest, render_text
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key"
@@ -15,12 +17,8 @@ def run_audit(url):
 
     # 🔐 Security Checks
     is_https = url.startswith("https://")
-    headers = response.headers
-    security_headers = {
-        "Content-Security-Policy": headers.get("Content-Security-Policy"),
-        "X-Frame-Options": headers.get("X-Frame-Options"),
-        "Strict-Transport-Security": headers.get("Strict-Transport-Security"),
-    }
+    header_check = check_headers(response)
+    security_headers = header_check["headers"]
     external_scripts = [s.get("src") for s in soup.find_all("script") if s.get("src")]
     insecure_scripts = [s for s in external_scripts if s and s.startswith("http://")]
 
@@ -61,6 +59,8 @@ def run_audit(url):
     if is_https:
         security_score += weights["security"]["https"]
     security_score += sum(weights["security"]["headers"] for h in security_headers.values() if h)
+    # weak policy values cost points even when the header is present
+    security_score = max(0, security_score - header_check["deduction"])
 
     performance_score = weights["performance"]["minified_assets"] if len(minified_assets) > 0 else 0
 
@@ -82,6 +82,8 @@ def run_audit(url):
         "security": {
             "is_https": is_https,
             "headers": security_headers,
+            "policy_findings": header_check["policy_findings"],
+            "policy_deduction": header_check["deduction"],
             "insecure_scripts": insecure_scripts,
             "score": security_score,
             "max": weights["security"]["https"] + weights["security"]["headers"] * len(security_headers)
@@ -132,32 +134,10 @@ def audit():
             "title": result["seo"]["title"]
         }
 
-        history_path = "data/history.json"
-        os.makedirs("data", exist_ok=True)
-
-        if os.path.exists(history_path):
-            with open(history_path, "r") as f:
-                history = json.load(f)
-        else:
-            history = []
-
-        history.insert(0, history_entry)
-
-        with open(history_path, "w") as f:
-            json.dump(history, f, indent=2)
-
-        # ✅ Save latest report
-        report_path = "data/latest_report.txt"
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(f"Audit Report for {url}\n\n")
-            for section, details in result.items():
-                f.write(f"{section.upper()}:\n")
-                if isinstance(details, dict):
-                    for k, v in details.items():
-                        f.write(f"  {k}: {v}\n")
-                else:
-                    f.write(f"{details}\n")
-                f.write("\n")
+        add_history(history_entry)
+
+        # ✅ Save latest report (compact JSON; the TXT is rendered on download)
+        save_latest(url, result)
 
         return render_template("report.html", url=url, result=result)
 
@@ -168,21 +148,17 @@ def audit():
 # 📂 History route
 @app.route("/history")
 def history():
-    history_path = "data/history.json"
-    if os.path.exists(history_path):
-        with open(history_path, "r") as f:
-            history = json.load(f)
-    else:
-        history = []
-
-    return render_template("history.html", history=history)
+    return render_template("history.html", history=load_history())
 
 # 📥 TXT Download route
 @app.route("/download")
 def download_report():
-    report_path = "data/latest_report.txt"
-    if os.path.exists(report_path):
-        return send_file(report_path, as_attachment=True)
+    latest = load_latest()
+    if latest:
+        response = make_response(render_text(latest["url"], latest["result"]))
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response.headers["Content-Disposition"] = "attachment; filename=latest_report.txt"
+        return response
     else:
         flash("Report file not found.")
         return redirect(url_for("home"))
@@ -216,6 +192,9 @@ def download_csv():
     writer.writerow(["Security", "HTTPS", "Yes" if result["security"]["is_https"] else "No"])
     for header, value in result["security"]["headers"].items():
         writer.writerow(["Security", header, "Present" if value else "Missing"])
+    for finding in result["security"]["policy_findings"]:
+        writer.writerow(["Security", "Policy " + finding["type"], finding["msg"]])
+    writer.writerow(["Security", "Policy Deduction", result["security"]["policy_deduction"]])
     for script in result["security"]["insecure_scripts"]:
         writer.writerow(["Security", "Insecure Script", script])
     writer.writerow(["Security", "Score", result["security"]["score"]])
@@ -0,0 +1,50 @@
+import json
+import os
+
+DATA_DIR = "data"
+HISTORY_PATH = os.path.join(DATA_DIR, "history.json")
+LATEST_PATH = os.path.join(DATA_DIR, "latest_report.json")
+
+# Stored as compact JSON (no indentation); the TXT report is rendered on download.
+COMPACT = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+def load_history():
+    if os.path.exists(HISTORY_PATH):
+        with open(HISTORY_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+def add_history(entry):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    history = load_history()
+    history.insert(0, entry)
+    with open(HISTORY_PATH, "w", encoding="utf-8") as f:
+        json.dump(history, f, **COMPACT)
+
+
+def save_latest(url, result):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(LATEST_PATH, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "result": result}, f, **COMPACT)
+
+
+def load_latest():
+    if not os.path.exists(LATEST_PATH):
+        return None
+    with open(LATEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def render_text(url, result):
+    lines = [f"Audit Report for {url}", ""]
+    for section, details in result.items():
+        lines.append(f"{section.upper()}:")
+        if isinstance(details, dict):
+            for k, v in details.items():
+                lines.append(f"  {k}: {v}")
+        else:
+            lines.append(f"{details}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
@@ -1,12 +1,24 @@
-import requests
+import math
+from audit_modules.headerpolicy import POLICY_MESSAGES, evaluate_policies, set_cookie_headers
 
-def check_headers(url):
-    response = requests.get(url)
+SECURITY_HEADERS = ['Content-Security-Policy', 'X-Frame-Options', 'Strict-Transport-Security']
+# headerpolicy penalty points that cost one security score point
+POLICY_PENALTY_PER_POINT = 5
+
+def check_headers(response):
+    """Which security headers a response sends, and what their policy values allow.
+
+    ``deduction`` is what weak policies (HSTS max-age=0, SameSite=None without
+    Secure, ...) take off the security score, even though the headers are present.
+    """
     headers = response.headers
-    security_headers = {
-        'Content-Security-Policy': headers.get('Content-Security-Policy', 'Missing'),
-        'X-Frame-Options': headers.get('X-Frame-Options', 'Missing'),
-        'Strict-Transport-Security': headers.get('Strict-Transport-Security', 'Missing'),
-        'X-Content-Type-Options': headers.get('X-Content-Type-Options', 'Missing'),
+    policy_codes, penalty = evaluate_policies({k.lower(): v for k, v in headers.items()}, set_cookie_headers(response))
+    return {
+        'headers': {h: headers.get(h) for h in SECURITY_HEADERS},
+        'policy_findings': [describe_policy(code, params) for code, params in policy_codes],
+        'deduction': math.ceil(penalty / POLICY_PENALTY_PER_POINT),
     }
-    return security_headers
+
+def describe_policy(code, params):
+    kind, template = POLICY_MESSAGES[code]
+    return {'type': kind, 'msg': template.format(**params)}
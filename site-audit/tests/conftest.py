@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app.py and the audit modules import "audit_modules" from the site-audit root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
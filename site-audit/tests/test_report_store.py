@@ -0,0 +1,26 @@
+from audit_modules import report_store
+
+
+def test_latest_report_stored_compact_and_rendered_on_download(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(report_store, "LATEST_PATH", str(tmp_path / "latest_report.json"))
+    result = {"security": {"is_https": True, "score": 3}, "score": "6/12"}
+
+    report_store.save_latest("https://example.com", result)
+    raw = (tmp_path / "latest_report.json").read_text(encoding="utf-8")
+    assert "\n" not in raw and ": " not in raw
+
+    latest = report_store.load_latest()
+    assert report_store.render_text(latest["url"], latest["result"]) == (
+        "Audit Report for https://example.com\n\n"
+        "SECURITY:\n  is_https: True\n  score: 3\n\n"
+        "SCORE:\n6/12\n\n"
+    )
+
+
+def test_history_newest_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(report_store, "HISTORY_PATH", str(tmp_path / "history.json"))
+    report_store.add_history({"url": "a"})
+    report_store.add_history({"url": "b"})
+    assert [e["url"] for e in report_store.load_history()] == ["b", "a"]
@@ -0,0 +1,107 @@
+from requests.structures import CaseInsensitiveDict
+
+from audit_modules.headerpolicy import (
+    evaluate_cookie, evaluate_cookie_attributes, evaluate_csp, evaluate_hsts,
+    evaluate_permissions_policy, evaluate_policies, evaluate_referrer_policy,
+)
+from audit_modules.security import check_headers, describe_policy
+
+
+def codes(findings):
+    return [f[0] for f in findings]
+
+
+def test_nonce_neutralises_unsafe_inline():
+    with_nonce = evaluate_csp("default-src 'self'; script-src 'self' 'nonce-r4nd0m' 'unsafe-inline'")
+    assert "csp.unsafe_inline" not in codes(with_nonce)
+    assert "csp.strict" in codes(with_nonce)
+
+    without = evaluate_csp("default-src 'self'; script-src 'self' 'unsafe-inline'")
+    assert "csp.unsafe_inline" in codes(without)
+
+
+def test_csp_missing_default_src_and_wildcards():
+    result = codes(evaluate_csp("script-src * 'unsafe-eval'"))
+    assert {"csp.no_default_src", "csp.wildcard", "csp.unsafe_eval"} <= set(result)
+
+
+def test_permissions_policy_camera_star():
+    result = evaluate_permissions_policy("camera=*, geolocation=(self), fullscreen=*")
+    assert codes(result) == ["permissions.open"]
+    assert result[0][1] == {"features": "camera"}     # fullscreen=* is not sensitive
+
+    assert codes(evaluate_permissions_policy("camera=(), microphone=()")) == ["permissions.ok"]
+
+
+def test_hsts_preload_eligibility():
+    eligible = codes(evaluate_hsts("max-age=63072000; includeSubDomains; preload"))
+    assert eligible == ["hsts.ok"]
+
+    short = codes(evaluate_hsts("max-age=15552000; includeSubDomains; preload"))
+    assert "hsts.preload_ineligible" in short
+
+    no_subdomains = codes(evaluate_hsts("max-age=63072000; preload"))
+    assert "hsts.preload_ineligible" in no_subdomains
+
+    assert codes(evaluate_hsts("max-age=0")) == ["hsts.disabled"]
+
+
+def test_samesite_none_without_secure():
+    result = evaluate_cookie("sid=abc123; Path=/; HttpOnly; SameSite=None")
+    assert result == (("cookie.samesite_insecure", {"name": "sid"}, 4),)
+
+    assert evaluate_cookie("sid=abc123; Path=/; Secure; HttpOnly; SameSite=None") == ()
+
+
+def test_cookie_cache_ignores_session_value():
+    evaluate_cookie_attributes.cache_clear()
+    evaluate_cookie("sid=token-one; Path=/; Secure")
+    evaluate_cookie("sid=token-two; Path=/; Secure")
+    info = evaluate_cookie_attributes.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_referrer_policy_fallbacks():
+    # last recognised value wins; unknown values are skipped
+    assert evaluate_referrer_policy("no-referrer, strict-origin-when-cross-origin")[0][:2] == \
+        ("referrer.ok", {"policy": "strict-origin-when-cross-origin"})
+    assert evaluate_referrer_policy("strict-origin, unsafe-url")[0][0] == "referrer.weak"
+    assert evaluate_referrer_policy("same-origin, made-up-policy")[0][:2] == \
+        ("referrer.ok", {"policy": "same-origin"})
+    assert evaluate_referrer_policy("bogus")[0][0] == "referrer.unknown"
+
+
+def test_evaluate_policies_renders_for_display():
+    findings, penalty = evaluate_policies({"strict-transport-security": "max-age=0"},
+                                          ["a=1; Secure; HttpOnly; SameSite=Lax"])
+    assert [describe_policy(code, params) for code, params in findings] == [
+        {"type": "error", "msg": "HSTS max-age is missing or 0; the policy is disabled."}
+    ]
+    assert penalty == 10
+
+
+class FakeRawHeaders:
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    def getlist(self, name):
+        return self.cookies if name == "Set-Cookie" else []
+
+
+class FakeResponse:
+    def __init__(self, headers, cookies=()):
+        self.headers = CaseInsensitiveDict(headers)
+        self.raw = type("Raw", (), {"headers": FakeRawHeaders(list(cookies))})()
+
+
+def test_check_headers_scores_weak_policies():
+    good = check_headers(FakeResponse({"Strict-Transport-Security": "max-age=63072000; includeSubDomains"}))
+    assert good["deduction"] == 0
+    assert good["headers"]["Strict-Transport-Security"] and good["headers"]["X-Frame-Options"] is None
+
+    disabled = check_headers(FakeResponse({"Strict-Transport-Security": "max-age=0"}))
+    assert disabled["deduction"] == 2
+    assert disabled["policy_findings"][0]["type"] == "error"
+
+    cookie = check_headers(FakeResponse({}, ["sid=1; Secure; HttpOnly; SameSite=Lax", "t=2; HttpOnly; SameSite=None"]))
+    assert cookie["deduction"] == 1